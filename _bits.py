@@ -0,0 +1,37 @@
+"""Numba compiled bit manipulation helpers.
+
+Kept apart from ``_fast`` so that using them does not compile the hand
+evaluators.
+"""
+
+from numba import int64, njit
+
+
+@njit(int64(int64), cache=True)
+def popcount_nb(bits):
+    """Count the set bits of a positive integer."""
+    bits = bits - ((bits >> 1) & 0x5555555555555555)
+    bits = (bits & 0x3333333333333333) + ((bits >> 2) & 0x3333333333333333)
+    bits = (bits + (bits >> 4)) & 0x0F0F0F0F0F0F0F0F
+    return (bits * 0x0101010101010101) >> 56
+
+
+@njit(int64(int64, int64), cache=True)
+def nth_set_bit_nb(bits, n):
+    """Get the index of the n-th (starting from 0) set bit of a positive integer."""
+    offset = 0
+
+    # Skip 16 bits at a time
+    count = popcount_nb(bits & 0xFFFF)
+    while n >= count:
+        n -= count
+        bits >>= 16
+        offset += 16
+        count = popcount_nb(bits & 0xFFFF)
+
+    # Clear the n lowest set bits
+    for _ in range(n):
+        bits &= bits - 1
+
+    # Index of the lowest set bit
+    return offset + popcount_nb((bits & -bits) - 1)
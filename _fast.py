@@ -0,0 +1,260 @@
+"""Numba compiled functions for the hot paths of the game.
+
+The lookup tables of ``evaluator`` are converted into plain arrays so that the
+functions compile in nopython mode:
+- flushes are indexed by the 13 bits mask of their ranks;
+- the other hands are found by binary search over the sorted prime-products.
+"""
+
+from itertools import combinations
+
+from _bits import popcount_nb
+
+from evaluator import CARD_CODES, CARD_RANKS, CARD_SUITS, FLUSH_LUT, RANK_PRIMES, UNSUITED_LUT
+
+from numba import float32, int8, int32, int64, njit
+
+import numpy as np
+
+_CARD_PRIMES = RANK_PRIMES[CARD_RANKS]
+_CARD_CODES = CARD_CODES.astype(np.int32)
+_CARD_BITS = (1 << CARD_RANKS).astype(np.int32)
+
+_SUBSETS_7 = np.array(list(combinations(range(7), 5)), dtype=np.int64)
+
+# Lowest bit of each of the 13 rank nibbles of a rank histogram
+_NIBBLES = 0x1111111111111
+
+
+def _build_tables():
+    """Convert the lookup tables into arrays."""
+    flush_table = np.full(1 << 13, -1, dtype=np.int32)
+    for ranks in combinations(range(13), 5):
+        product = 1
+        mask = 0
+        for rank in ranks:
+            product *= int(RANK_PRIMES[rank])
+            mask |= 1 << rank
+        flush_table[mask] = FLUSH_LUT[product]
+
+    unsuited_keys = np.array(sorted(UNSUITED_LUT), dtype=np.int64)
+    unsuited_values = np.array([UNSUITED_LUT[key] for key in unsuited_keys], dtype=np.int32)
+
+    return flush_table, unsuited_keys, unsuited_values
+
+
+_FLUSH_TABLE, _UNSUITED_KEYS, _UNSUITED_VALUES = _build_tables()
+
+
+@njit(int64(int64), cache=True)
+def _compact_nb(nibbles):
+    """Gather the lowest bit of each of the 13 rank nibbles into a rank mask."""
+    mask = 0
+    for rank in range(13):
+        mask |= ((nibbles >> (4 * rank)) & 1) << rank
+    return mask
+
+
+@njit(int64(int64), cache=True)
+def _highest_rank_nb(mask):
+    """Get the highest rank of a rank mask."""
+    rank = 12
+    while rank > 0 and not (mask >> rank) & 1:
+        rank -= 1
+    return rank
+
+
+@njit(int64(int64, int64), cache=True)
+def _top_ranks_nb(mask, number_of_ranks):
+    """Keep the highest ranks of a rank mask."""
+    while popcount_nb(mask) > number_of_ranks:
+        mask &= mask - 1
+    return mask
+
+
+@njit(int64(int64), cache=True)
+def _straight_nb(mask):
+    """Get the rank mask of the highest straight in a rank mask, 0 if none."""
+    # Bit 0 is the Ace played low, bit i + 1 is rank i
+    ranks = (mask << 1) | ((mask >> 12) & 1)
+    runs = ranks & (ranks >> 1) & (ranks >> 2) & (ranks >> 3) & (ranks >> 4)
+    if runs == 0:
+        return 0
+
+    low = _highest_rank_nb(runs)
+    if low == 0:
+        return 0x100F
+    return 0x1F << (low - 1)
+
+
+@njit(int64(int64), cache=True)
+def _mask_product_nb(mask):
+    """Multiply the primes of the ranks in a rank mask."""
+    product = 1
+    for rank in range(13):
+        if (mask >> rank) & 1:
+            product *= RANK_PRIMES[rank]
+    return product
+
+
+@njit(int32(int64), cache=True)
+def _unsuited_value_nb(product):
+    """Get the value of a hand w/o flush from its prime-product."""
+    return _UNSUITED_VALUES[np.searchsorted(_UNSUITED_KEYS, product)]
+
+
+@njit(int32(int8[::1]), cache=True, fastmath=True)
+def evaluate7_nb(cards):
+    """Get the value of the best 5 cards hand out of 7 cards."""
+    best = np.int32(7462)
+
+    for subset in range(_SUBSETS_7.shape[0]):
+        product = np.int64(1)
+        code = np.int32(0xFF)
+        mask = np.int32(0)
+
+        for idx in range(5):
+            card = cards[_SUBSETS_7[subset, idx]]
+            product *= _CARD_PRIMES[card]
+            code &= _CARD_CODES[card]
+            mask |= _CARD_BITS[card]
+
+        if code & 0xF0:
+            value = _FLUSH_TABLE[mask]
+        else:
+            value = _UNSUITED_VALUES[np.searchsorted(_UNSUITED_KEYS, product)]
+
+        if value < best:
+            best = value
+
+    return best
+
+
+@njit(int32(int8[::1]), cache=True, fastmath=True)
+def evaluate7_hist_nb(cards):
+    """Get the value of the best 5 cards hand out of 7 cards.
+
+    Same values as ``evaluate7_nb`` without going through the 21 subsets. The
+    count of each rank is packed in a 4 bits nibble of a rank histogram and
+    the ranks of each suit in 16 bits of a suit mask, so that every category
+    is found with a few bitwise operations.
+    """
+    hist = np.int64(0)
+    suits = np.int64(0)
+    ranks = np.int64(0)
+
+    for card in cards:
+        rank = CARD_RANKS[card]
+        hist += np.int64(1) << (4 * rank)
+        suits |= np.int64(1) << (16 * CARD_SUITS[card] + rank)
+        ranks |= np.int64(1) << rank
+
+    # Flush and straight flush, no other category is possible with 7 cards
+    for suit in range(4):
+        flush = (suits >> (16 * suit)) & 0x1FFF
+        if popcount_nb(flush) >= 5:
+            straight = _straight_nb(flush)
+            if straight:
+                return _FLUSH_TABLE[straight]
+            return _FLUSH_TABLE[_top_ranks_nb(flush, 5)]
+
+    # Ranks appearing 4, 3 and exactly 2 times
+    quads = _compact_nb((hist >> 2) & _NIBBLES)
+    trips = _compact_nb(hist & (hist >> 1) & _NIBBLES)
+    pairs = _compact_nb((hist >> 1) & ~hist & _NIBBLES)
+
+    if quads:
+        quad = _highest_rank_nb(quads)
+        kicker = _highest_rank_nb(ranks & ~(1 << quad))
+        return _unsuited_value_nb(RANK_PRIMES[quad] ** 4 * RANK_PRIMES[kicker])
+
+    if trips:
+        trip = _highest_rank_nb(trips)
+        full = (trips & ~(1 << trip)) | pairs
+        if full:
+            pair = _highest_rank_nb(full)
+            return _unsuited_value_nb(RANK_PRIMES[trip] ** 3 * RANK_PRIMES[pair] ** 2)
+
+    straight = _straight_nb(ranks)
+    if straight:
+        return _unsuited_value_nb(_mask_product_nb(straight))
+
+    if trips:
+        kickers = _top_ranks_nb(ranks & ~(1 << trip), 2)
+        return _unsuited_value_nb(RANK_PRIMES[trip] ** 3 * _mask_product_nb(kickers))
+
+    if popcount_nb(pairs) >= 2:
+        two_pairs = _top_ranks_nb(pairs, 2)
+        kicker = _highest_rank_nb(ranks & ~two_pairs)
+        return _unsuited_value_nb(_mask_product_nb(two_pairs) ** 2 * RANK_PRIMES[kicker])
+
+    if pairs:
+        pair = _highest_rank_nb(pairs)
+        kickers = _top_ranks_nb(ranks & ~(1 << pair), 3)
+        return _unsuited_value_nb(RANK_PRIMES[pair] ** 2 * _mask_product_nb(kickers))
+
+    return _unsuited_value_nb(_mask_product_nb(_top_ranks_nb(ranks, 5)))
+
+
+@njit(float32(int8[::1], int8[::1], int64, int64, int64), cache=True, fastmath=True)
+def mc_equity_nb(hole, board, n_opp, n_iter, seed):
+    """Estimate the equity of the hole cards against n_opp random hands.
+
+    The missing board cards and the opponents' hands are sampled from the
+    remaining deck for n_iter times. Split pots count as a share of the win.
+    No equity (0) is estimated when n_iter is not positive.
+    """
+    if n_iter <= 0:
+        return 0.0
+
+    np.random.seed(seed)
+
+    # Remaining deck
+    used = np.zeros(52, dtype=np.bool_)
+    for card in hole:
+        used[card] = True
+    for card in board:
+        used[card] = True
+
+    deck = np.empty(52 - hole.size - board.size, dtype=np.int8)
+    idx = 0
+    for card in range(52):
+        if not used[card]:
+            deck[idx] = card
+            idx += 1
+
+    n_board = 5 - board.size
+    n_draw = n_board + 2 * n_opp
+
+    hand = np.empty(7, dtype=np.int8)
+    hand[2:2 + board.size] = board
+
+    equity = 0.0
+    for _ in range(n_iter):
+        # Partial Fisher-Yates shuffle of the cards to draw
+        for idx in range(n_draw):
+            swap = np.random.randint(idx, deck.size)
+            deck[idx], deck[swap] = deck[swap], deck[idx]
+
+        hand[2 + board.size:] = deck[:n_board]
+
+        hand[:2] = hole
+        value = evaluate7_hist_nb(hand)
+
+        ties = 0
+        lost = False
+        for opp in range(n_opp):
+            hand[0] = deck[n_board + 2 * opp]
+            hand[1] = deck[n_board + 2 * opp + 1]
+            opp_value = evaluate7_hist_nb(hand)
+
+            if opp_value < value:
+                lost = True
+                break
+            if opp_value == value:
+                ties += 1
+
+        if not lost:
+            equity += 1.0 / (ties + 1)
+
+    return equity / n_iter
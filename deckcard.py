@@ -1,8 +1,11 @@
 """Contains all classes to use a deck of cards."""
 
-import random
 from enum import Enum
-from typing import List, Union
+from typing import Union
+
+from _bits import nth_set_bit_nb
+
+import numpy as np
 
 
 class Seed(Enum):
@@ -17,12 +20,20 @@ class Seed(Enum):
 class Card:
     """Card types w/o Jolly."""
 
+    __slots__ = ('seed', 'value', 'max_value')
+
     def __init__(self, seed: Seed, value: int):
         """Init the card class."""
         self.seed = seed
         self.value = value
         self.max_value = 13
 
+    @classmethod
+    def from_int(cls, index: int) -> 'Card':
+        """Create the card from its integer index (0-51)."""
+        seed, value = divmod(int(index), 13)
+        return cls(Seed(seed), value + 1)
+
     def __str__(self):
         """Print the card in text format."""
         return covert_to_human_readable(self)
@@ -35,6 +46,10 @@ class Card:
         """Define flooring for the card class."""
         return 1
 
+    def __int__(self) -> int:
+        """Define the integer index (0-51) of the card."""
+        return self.seed.value * self.max_value + self.value - 1
+
     def __eq__(self, other):
         """Define eq operator for the card class."""
         return self.seed == other.seed and self.value == other.value
@@ -45,42 +60,43 @@ class Card:
 
 
 class Deck:
-    """Deck of 52 cards w/o jolly."""
+    """Deck of 52 cards w/o jolly.
+
+    The cards left in the deck are the set bits of an integer, bit i being the
+    card of index i.
+    """
 
-    def __init__(self):
+    def __init__(self, rng: np.random.Generator = None):
         """Init the deck card."""
-        self.deck = {}
         self.max_value = 13
+        self.rng = np.random.default_rng() if rng is None else rng
         self.reset()
 
     def reset(self):
         """Reset the deck card."""
-        for seed in Seed:
-            for value in range(1, self.max_value + 1):
-                self.deck[Card(seed, value)] = True
+        self.bits = (1 << 52) - 1
+        self.n_remaining = 52
 
-    def draw_random(self, number_of_cards: int = 1) -> Union[Card, List]:
-        """Draw a number of cards randomly."""
-        cards = []
-        idx = 0
+    def draw_random(self, number_of_cards: int = 1) -> Union[int, np.ndarray]:
+        """Draw a number of cards randomly and return their indexes."""
+        cards = np.empty(number_of_cards, dtype=np.int8)
 
-        while idx < number_of_cards:
-            seed = random.choice(list(Seed))
-            value = random.randint(1, self.max_value)
-
-            if self.deck[Card(seed, value)]:
-                card = Card(seed, value)
-                cards.append(card)
-                idx += 1
-                self.deck[Card(seed, value)] = False
+        for idx in range(number_of_cards):
+            card = nth_set_bit_nb(self.bits, int(self.rng.integers(self.n_remaining)))
+            self.bits &= ~(1 << card)
+            self.n_remaining -= 1
+            cards[idx] = card
 
         if cards.__len__() == 1:
-            return cards[0]
+            return int(cards[0])
         return cards
 
 
-def covert_to_human_readable(card: Card) -> str:
-    """Convert card into human-readable format."""
+def covert_to_human_readable(card: Union[Card, int]) -> str:
+    """Convert card, or its integer index, into human-readable format."""
+    if not isinstance(card, Card):
+        card = Card.from_int(card)
+
     if card.value == 11:
         card_value = 'J'
     elif card.value == 12:
@@ -0,0 +1,144 @@
+"""Functions for ranking poker hands.
+
+Cards are identified by their index (0-51) as returned by ``int(Card)``. Each
+rank is mapped to a unique prime so that the product of the primes of five
+cards identifies the ranks of the hand regardless of their order. The product
+is then used as key of a lookup table containing the 7462 distinct hand values.
+The lower the value, the stronger the hand (0 is a royal flush).
+"""
+
+from itertools import combinations
+
+import numpy as np
+
+# One prime for each rank, from 2 (index 0) to Ace (index 12)
+RANK_PRIMES = np.array([2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41], dtype=np.int64)
+
+NUMBER_OF_HANDS = 7462
+
+# Rank (0 for 2 up to 12 for Ace) and suit of each card index
+CARD_RANKS = (np.arange(52, dtype=np.int64) - 1) % 13
+CARD_SUITS = np.arange(52, dtype=np.int64) // 13
+
+# Card codes: one-hot suit in the high nibble, rank in the low nibble
+CARD_CODES = (0x10 << CARD_SUITS) | CARD_RANKS
+
+_RANKS_DESC = tuple(range(12, -1, -1))
+_STRAIGHTS = tuple(tuple(range(top, top - 5, -1)) for top in range(12, 3, -1)) + ((12, 3, 2, 1, 0),)
+
+# All the 5 cards subsets of a 7 cards hand
+_SUBSETS_7 = tuple(combinations(range(7), 5))
+
+# Plain python copies for the scalar evaluator
+_PRIMES = tuple(int(prime) for prime in RANK_PRIMES[CARD_RANKS])
+_CODES = tuple(int(code) for code in CARD_CODES)
+
+
+def _product(ranks) -> int:
+    """Multiply the primes of the given ranks."""
+    product = 1
+    for rank in ranks:
+        product *= int(RANK_PRIMES[rank])
+    return product
+
+
+def _build_luts():
+    """Build the lookup tables from prime-product to hand value."""
+    flush_lut = {}
+    unsuited_lut = {}
+
+    straights = set(frozenset(straight) for straight in _STRAIGHTS)
+    no_straights = [ranks for ranks in combinations(_RANKS_DESC, 5) if frozenset(ranks) not in straights]
+
+    # Straight flush
+    value = 0
+    for straight in _STRAIGHTS:
+        flush_lut[_product(straight)] = value
+        value += 1
+
+    # Four of a kind
+    for quad in _RANKS_DESC:
+        for kicker in _RANKS_DESC:
+            if kicker != quad:
+                unsuited_lut[_product((quad,) * 4 + (kicker,))] = value
+                value += 1
+
+    # Full house
+    for trip in _RANKS_DESC:
+        for pair in _RANKS_DESC:
+            if pair != trip:
+                unsuited_lut[_product((trip,) * 3 + (pair,) * 2)] = value
+                value += 1
+
+    # Flush
+    for ranks in no_straights:
+        flush_lut[_product(ranks)] = value
+        value += 1
+
+    # Straight
+    for straight in _STRAIGHTS:
+        unsuited_lut[_product(straight)] = value
+        value += 1
+
+    # Three of a kind
+    for trip in _RANKS_DESC:
+        kickers = [rank for rank in _RANKS_DESC if rank != trip]
+        for kicker in combinations(kickers, 2):
+            unsuited_lut[_product((trip,) * 3 + kicker)] = value
+            value += 1
+
+    # Two pairs
+    for high, low in combinations(_RANKS_DESC, 2):
+        for kicker in _RANKS_DESC:
+            if kicker not in (high, low):
+                unsuited_lut[_product((high, high, low, low, kicker))] = value
+                value += 1
+
+    # One pair
+    for pair in _RANKS_DESC:
+        kickers = [rank for rank in _RANKS_DESC if rank != pair]
+        for kicker in combinations(kickers, 3):
+            unsuited_lut[_product((pair, pair) + kicker)] = value
+            value += 1
+
+    # High card
+    for ranks in no_straights:
+        unsuited_lut[_product(ranks)] = value
+        value += 1
+
+    assert value == NUMBER_OF_HANDS
+    return flush_lut, unsuited_lut
+
+
+FLUSH_LUT, UNSUITED_LUT = _build_luts()
+
+
+def evaluate5(cards) -> int:
+    """Get the value of a 5 cards hand."""
+    c0, c1, c2, c3, c4 = (int(card) for card in cards)
+    product = _PRIMES[c0] * _PRIMES[c1] * _PRIMES[c2] * _PRIMES[c3] * _PRIMES[c4]
+
+    if _CODES[c0] & _CODES[c1] & _CODES[c2] & _CODES[c3] & _CODES[c4] & 0xF0:
+        return FLUSH_LUT[product]
+    return UNSUITED_LUT[product]
+
+
+def evaluate7(cards: np.ndarray) -> int:
+    """Get the value of the best 5 cards hand out of 7 cards."""
+    cards = [int(card) for card in cards]
+    primes = [_PRIMES[card] for card in cards]
+    codes = [_CODES[card] for card in cards]
+
+    best = NUMBER_OF_HANDS
+    for i0, i1, i2, i3, i4 in _SUBSETS_7:
+        product = primes[i0] * primes[i1] * primes[i2] * primes[i3] * primes[i4]
+
+        if codes[i0] & codes[i1] & codes[i2] & codes[i3] & codes[i4] & 0xF0:
+            value = FLUSH_LUT[product]
+        else:
+            value = UNSUITED_LUT[product]
+
+        if value < best:
+            best = value
+
+    return best
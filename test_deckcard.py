@@ -0,0 +1,51 @@
+"""Tests for the deck of cards."""
+
+import random
+
+from _bits import nth_set_bit_nb, popcount_nb
+
+from deckcard import Card, Deck, Seed, covert_to_human_readable
+
+import numpy as np
+
+import pytest
+
+
+@pytest.mark.parametrize('bits', [1, 0x8000, 1 << 51, (1 << 52) - 1, 0b1011001, 0xF0000F0000F])
+def test_nth_set_bit(bits):
+    """Check each set bit is found at its position."""
+    set_bits = [idx for idx in range(52) if bits >> idx & 1]
+
+    assert popcount_nb(bits) == len(set_bits)
+    assert [nth_set_bit_nb(bits, n) for n in range(len(set_bits))] == set_bits
+
+
+def test_nth_set_bit_random():
+    """Check random masks against a python reference."""
+    rng = random.Random(0)
+    for _ in range(1000):
+        bits = rng.getrandbits(52) | 1
+        set_bits = [idx for idx in range(52) if bits >> idx & 1]
+        n = rng.randrange(len(set_bits))
+
+        assert nth_set_bit_nb(bits, n) == set_bits[n]
+
+
+def test_deck_draws_every_card_once():
+    """Check the deck runs out after drawing all the 52 cards."""
+    deck = Deck(np.random.default_rng(0))
+    cards = list(deck.draw_random(50)) + [deck.draw_random(), deck.draw_random()]
+
+    assert sorted(cards) == list(range(52))
+    assert deck.n_remaining == 0
+
+    deck.reset()
+    assert deck.n_remaining == 52
+
+
+def test_card_index():
+    """Check the card to index round trip."""
+    for index in range(52):
+        assert int(Card.from_int(index)) == index
+
+    assert covert_to_human_readable(int(Card(Seed.HEART, 12))) == '♥Q'
@@ -0,0 +1,54 @@
+"""Tests for the hand evaluators."""
+
+from itertools import combinations
+
+from _fast import evaluate7_hist_nb, evaluate7_nb
+
+from evaluator import evaluate5, evaluate7
+
+import numpy as np
+
+import pytest
+
+_VALUES = {'A': 1, 'T': 10, 'J': 11, 'Q': 12, 'K': 13, **{str(value): value for value in range(2, 10)}}
+_SEEDS = {'s': 0, 'h': 1, 'd': 2, 'c': 3}
+
+
+def _cards(text: str) -> np.ndarray:
+    """Convert cards such as 'As Td 2c' into their indexes."""
+    return np.array([_SEEDS[card[1]] * 13 + _VALUES[card[0]] - 1 for card in text.split()], dtype=np.int8)
+
+
+@pytest.mark.parametrize(
+    'hand, value',
+    [
+        ('As Ks Qs Js Ts 2h 3d', 0),  # royal flush
+        ('2s 3s 4s 5s 6s 7s Kh', 7),  # 6 suited cards with a 7-high straight flush
+        ('As 2s 3s 4s 5s 9h Jd', 9),  # steel wheel
+        ('Ah Ad Ac As Kh Kd Kc', 10),  # quads over trips
+        ('Ah Ad Ac Kh Kd Kc 2s', 166),  # two trips
+        ('As Ks Qs Js 9s 7s 2s', 322),  # 7 suited cards
+        ('As 2h 3d 4c 5s 6h Kd', 1607),  # six-high straight over the wheel
+        ('As 2h 3d 4c 5s 9h Jd', 1608),  # wheel
+        ('Ah Ad Kh Kd Qh Qd 2c', 2467),  # three pairs
+    ],
+)
+def test_edge_hands(hand, value):
+    """Check the value of hands the evaluators could get wrong."""
+    cards = _cards(hand)
+
+    assert evaluate7(cards) == value
+    assert evaluate7_nb(cards) == value
+    assert evaluate7_hist_nb(cards) == value
+
+
+def test_random_hands():
+    """Check all the evaluators agree on random hands."""
+    rng = np.random.default_rng(0)
+    for _ in range(2000):
+        cards = rng.permutation(52)[:7].astype(np.int8)
+        value = evaluate7(cards)
+
+        assert value == min(evaluate5(hand) for hand in combinations(cards, 5))
+        assert evaluate7_nb(cards) == value
+        assert evaluate7_hist_nb(cards) == value
@@ -0,0 +1,143 @@
+"""Tests for the Texas Holdem environments."""
+
+import copy
+import pickle
+
+import numpy as np
+
+import pytest
+
+from texasholdem import BatchTexasHoldemEnv, TexasHoldemEnv
+
+
+@pytest.mark.parametrize('clone', [lambda env: pickle.loads(pickle.dumps(env)), copy.deepcopy])
+def test_clone_keeps_the_board_in_the_observation(clone):
+    """Check a cloned environment still reveals the board into its observation."""
+    env = clone(TexasHoldemEnv(seed=1))
+    observation, _, _, _ = env.step(0)
+
+    board = 2 * env.stacks.size
+    assert np.array_equal(observation[2:5], env._deck_perm[board:board + 3])
+    assert '_ _ _' not in str(env)
+
+    batch = clone(BatchTexasHoldemEnv(3, seed=1))
+    observation, _, _, _ = batch.step(np.zeros(3))
+
+    assert np.array_equal(observation[:, 2:5], batch._deck_perm[:, board:board + 3])
+    assert np.array_equal(batch.board, observation[:, 2:])
+
+
+def test_batch_reset_only_masked_games():
+    """Check reset(done_mask) leaves the other games untouched."""
+    env = BatchTexasHoldemEnv(4, seed=0)
+    env.step(np.zeros(4))
+    env.step(np.zeros(4))
+
+    before = {name: getattr(env, name).copy() for name in ('_obs', 'phase', '_deck_perm', 'dealer_id', 'stacks', 'cards')}
+    done_mask = np.array([True, False, True, False])
+    env.reset(done_mask)
+
+    for name, value in before.items():
+        assert np.array_equal(getattr(env, name)[~done_mask], value[~done_mask]), name
+
+    assert np.all(env.phase[done_mask] == 0)
+    assert np.all(env.board[done_mask] == -1)
+    assert np.array_equal(env.dealer_id[done_mask], (before['dealer_id'][done_mask] + 1) % 5)
+    assert np.array_equal(env._obs[done_mask, :2], env.cards[done_mask, 0])
+
+
+def test_batch_step_reveals_each_game_board():
+    """Check each phase reveals the next board slots from the game's own deck."""
+    env = BatchTexasHoldemEnv(3, seed=0)
+    board = 2 * env.number_of_players
+
+    # Phase and number of board cards shown after each step
+    for phase, shown in [(1, 3), (2, 4), (4, 5)]:
+        observation, _, done, _ = env.step(np.zeros(3))
+
+        assert np.all(env.phase == phase)
+        assert np.array_equal(observation[:, 2:2 + shown], env._deck_perm[:, board:board + shown])
+        assert np.all(observation[:, 2 + shown:] == -1)
+        assert np.all(done == (phase == 4))
+
+    # Games in different phases
+    env.reset(np.array([False, True, False]))
+    env.step(np.zeros(3))
+
+    assert np.array_equal(env.phase, [4, 1, 4])
+    assert np.array_equal(env.board[1, :3], env._deck_perm[1, board:board + 3])
+    assert np.all(env.board[1, 3:] == -1)
+
+
+@pytest.mark.parametrize('number_of_players', [2, 3, 5])
+def test_batch_blinds_match_single_env(number_of_players):
+    """Check both environments choose the same blinds and post the same chips."""
+    stacks = np.array([15, 1000, 5, 1000, 20][:number_of_players], dtype=np.float64)
+
+    for dealer_id in range(number_of_players):
+        env = TexasHoldemEnv(number_of_players=number_of_players, seed=0)
+        env.stacks[:] = stacks
+        env.dealer_id = (dealer_id - 1) % number_of_players
+        env.reset()
+
+        batch = BatchTexasHoldemEnv(1, number_of_players=number_of_players, seed=0)
+        batch.stacks[:] = stacks
+        batch.dealer_id[:] = (dealer_id - 1) % number_of_players
+        batch.reset()
+
+        assert env.dealer_id == batch.dealer_id[0] == dealer_id
+        for name in ('is_dealer', 'is_small_blind', 'is_big_blind', 'is_all_in', 'stacks'):
+            assert np.array_equal(getattr(env, name), getattr(batch, name)[0]), name
+        assert env.stake == batch.stake[0]
+
+
+def test_heads_up_dealer_posts_small_blind():
+    """Check the dealer posts the small blind in a 2 players game."""
+    env = TexasHoldemEnv(number_of_players=2, seed=0)
+    for _ in range(4):
+        env.stacks[:] = env.initial_stack
+        env.reset()
+        other = 1 - env.dealer_id
+
+        assert env.is_small_blind[env.dealer_id] and env.is_big_blind[other]
+        assert env.stacks[env.dealer_id] == env.initial_stack - env.small_blind
+        assert env.stacks[other] == env.initial_stack - env.big_blind
+        assert env.stake == env.small_blind + env.big_blind
+
+
+def test_short_stack_goes_all_in():
+    """Check a blind short of chips pays what it has and goes all in."""
+    env = TexasHoldemEnv(number_of_players=3, seed=0)
+    env.stacks[:] = 15
+    env.reset()
+    small_blind = np.flatnonzero(env.is_small_blind)[0]
+    big_blind = np.flatnonzero(env.is_big_blind)[0]
+
+    assert env.stacks[small_blind] == 5 and not env.is_all_in[small_blind]
+    assert env.stacks[big_blind] == 0 and env.is_all_in[big_blind]
+    assert env.stake == 25
+    assert np.count_nonzero(env.is_all_in) == 1
+
+
+def test_is_dealer_follows_dealer_id():
+    """Check the dealer flag moves with the dealer at each reset."""
+    env = TexasHoldemEnv(seed=0)
+    for _ in range(2 * env.stacks.size):
+        dealer_id = env.dealer_id
+        env.stacks[:] = env.initial_stack
+        env.reset()
+
+        assert env.dealer_id == (dealer_id + 1) % env.stacks.size
+        assert np.array_equal(np.flatnonzero(env.is_dealer), [env.dealer_id])
+
+
+def test_seed_reproduces_the_game():
+    """Check seeding two environments gives the same observation and dealer."""
+    first, second = TexasHoldemEnv(seed=1), TexasHoldemEnv(seed=2)
+    for env in (first, second):
+        env.seed(3)
+        env.reset()
+
+    assert np.array_equal(first._obs, second._obs)
+    assert first.dealer_id == second.dealer_id
+    assert np.array_equal(first._deck_perm, second._deck_perm)
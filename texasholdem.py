@@ -1,40 +1,63 @@
 """Functions for the defining the texas holdem game."""
 
-import random
 from enum import Enum
 
-from deckcard import Deck, covert_to_human_readable
+from deckcard import covert_to_human_readable
 
 from gym import Env, spaces
 
+import numpy as np
 
-class Player:
-    """Player for the Texas Holdem card game."""
 
-    def __init__(self, id_in: int, stack: float):
-        """Init the player class."""
+class PlayerView:
+    """Object-style view on a single player of a ``TexasHoldemEnv``."""
+
+    __slots__ = ('_env', 'id')
+
+    def __init__(self, env, id_in: int):
+        """Init the player view."""
+        self._env = env
         self.id = id_in
-        self.stack = stack
-        self.cards = []
-        self.is_active = True
-        self.is_all_in = False
-        self.is_dealer = False
-        self.is_small_blind = False
-        self.is_big_blind = False
+
+    @property
+    def stack(self) -> float:
+        """Chips left to the player."""
+        return float(self._env.stacks[self.id])
+
+    @property
+    def cards(self) -> np.ndarray:
+        """Hole cards of the player (-1 when not dealt)."""
+        return self._env.cards[self.id]
+
+    @property
+    def is_active(self) -> bool:
+        """Whether the player is still in the hand."""
+        return bool(self._env.is_active[self.id])
+
+    @property
+    def is_all_in(self) -> bool:
+        """Whether the player has gone all in."""
+        return bool(self._env.is_all_in[self.id])
+
+    @property
+    def is_dealer(self) -> bool:
+        """Whether the player is the dealer."""
+        return bool(self._env.is_dealer[self.id])
+
+    @property
+    def is_small_blind(self) -> bool:
+        """Whether the player is the small blind."""
+        return bool(self._env.is_small_blind[self.id])
+
+    @property
+    def is_big_blind(self) -> bool:
+        """Whether the player is the big blind."""
+        return bool(self._env.is_big_blind[self.id])
 
     def __str__(self):
         """Print the player as a text."""
         return f'Player {self.id} has {self.stack} chips'
 
-    def reset(self):
-        """Reset the player class."""
-        self.cards = []
-        self.is_active = False
-        self.is_all_in = False
-        self.is_dealer = False
-        self.is_small_blind = False
-        self.is_big_blind = False
-
 
 class Action(Enum):
     """Define the possible actions for a player."""
@@ -54,30 +77,11 @@ class Phase(Enum):
     SHOWDOWN = 4
 
 
-class StateMachine(Enum):
-    """Manage the state machine between game phases."""
-
-    DRAW_CARD = 0
-    DRAW_TWO_CARDS = 1
-    DRAW_THREE_CARDS = 2
-    ASK_ACTION = 3
-    START_GAME = 4
-    END_GAME = 5
-
-    def get_next(self):
-        """Get the next phase of the game."""
-        if self == StateMachine.START_GAME:
-            return StateMachine.DRAW_TWO_CARDS
-        elif self == StateMachine.DRAW_CARD:
-            return StateMachine.DRAW_TWO_CARDS
-        elif self == StateMachine.DRAW_TWO_CARDS:
-            return StateMachine.DRAW_THREE_CARDS
-        elif self == StateMachine.DRAW_THREE_CARDS:
-            return StateMachine.ASK_ACTION
-        elif self == StateMachine.ASK_ACTION:
-            return StateMachine.DRAW_CARD
-        else:  # self == StateMachine.END_GAME:
-            return StateMachine.START_GAME
+# Info returned by every step, shared between calls: do not modify it
+_EMPTY_INFO = {}
+
+# Unshuffled deck, copied in place before every shuffle
+_DECK = np.arange(52, dtype=np.int8)
 
 
 class TexasHoldemEnv(Env):
@@ -89,67 +93,112 @@ class TexasHoldemEnv(Env):
         initial_stack: float = 1000,
         small_blind: float = 10,
         max_steps: int = 1000,
+        equity_iterations: int = 0,
+        seed: int = None,
     ):
         """Init the setup of the class."""
         self.initial_stack = initial_stack
-        self.players = [
-            Player(player_id, initial_stack) for player_id in range(number_of_players)
-        ]
+        self._n_players = number_of_players
+
+        # Players state, one entry per player
+        self.stacks = np.full(number_of_players, initial_stack, dtype=np.float64)
+        self.cards = np.full((number_of_players, 2), -1, dtype=np.int8)
+        self.is_active = np.ones(number_of_players, dtype=bool)
+        self.is_all_in = np.zeros(number_of_players, dtype=bool)
+        self.is_dealer = np.zeros(number_of_players, dtype=bool)
+        self.is_small_blind = np.zeros(number_of_players, dtype=bool)
+        self.is_big_blind = np.zeros(number_of_players, dtype=bool)
+        self.equity = np.zeros(number_of_players, dtype=np.float32)
+
+        # Seats following each seat, in playing order
+        self._next_after = np.array(
+            [[(seat + k) % number_of_players for k in range(1, number_of_players)] for seat in range(number_of_players)],
+            dtype=np.int8,
+        )
+
         self.small_blind = small_blind
         self.big_blind = small_blind * 2.0
 
         self.action_space = spaces.Discrete(3)
-        self.observation_space = spaces.Discrete(3)
+        self.observation_space = spaces.Box(low=-1, high=51, shape=(7,), dtype=np.int8)
+
+        self._table = {Phase.FLOP: None, Phase.TURN: None, Phase.RIVER: None}
+
+        # Observation: hole cards of player 0 followed by the board
+        self._obs = np.full(7, -1, dtype=np.int8)
+        self._board = self._obs[2:]
 
-        self.active_players = self._get_active_players()
-        self.__table = {Phase.FLOP: None, Phase.TURN: None, Phase.RIVER: None}
-        self.game_state = StateMachine.START_GAME
+        self.game_state = Phase.PREFLOP
         self.stake = None
 
         self.max_steps = max_steps
+        self.equity_iterations = equity_iterations
 
-        self.deck = Deck()
+        self._rng = np.random.default_rng(seed)
+        self._deck_perm = np.arange(52, dtype=np.int8)
 
-        # Set the dealer
-        self.dealer_id = random.choice(self.active_players)
-        self.players[self.dealer_id].is_dealer = True
-        self.players_active = self._get_active_players()
+        # Step of each game phase
+        self._step_table = {
+            Phase.PREFLOP: self._step_preflop,
+            Phase.FLOP: self._step_flop,
+            Phase.TURN: self._step_turn,
+            Phase.SHOWDOWN: self._step_noop,
+        }
 
-        self._set_small_blind()
+        # Set the dealer
+        self._draw_dealer()
 
         self.reset()
 
-    def _get_active_players(self) -> list:
-        """Get a list of all active players."""
-        return [idx for idx, player in enumerate(self.players) if player.is_active]
+    @property
+    def players(self) -> list:
+        """Get an object-style view of each player."""
+        return [PlayerView(self, player_id) for player_id in range(self._n_players)]
+
+    def _get_active_players(self) -> np.ndarray:
+        """Get the ids of all active players."""
+        return np.flatnonzero(self.is_active)
+
+    def _next_active(self, start: int) -> int:
+        """Get the id of the next active player after the start player."""
+        seats = self._next_after[start]
+        return int(seats[np.argmax(self.is_active[seats])])
 
-    def __get_next_active_player_id(self, current_player) -> int:
-        """Get the id of the next active player starting from current player."""
-        next_player = (current_player + 1) % len(self.active_players)
-        max_loop = len(self.players)
-        idx_loop = 0
-        while not self.players[next_player].is_dealer and idx_loop < max_loop:
-            idx_loop += 1
-            next_player += 1
+    def _draw_dealer(self) -> None:
+        """Draw a random dealer among the active players."""
+        active_players = self._get_active_players()
+        self.dealer_id = int(active_players[self._rng.integers(active_players.size)])
 
-        return next_player
+        self.is_dealer[:] = False
+        self.is_dealer[self.dealer_id] = True
 
     def _set_dealer(self) -> None:
         """Set dealer."""
-        next_dealer = self.__get_next_active_player_id(self.dealer_id + 1)
+        next_dealer = self._next_active(self.dealer_id)
 
-        self.players[next_dealer].is_dealer = True
+        self.is_dealer[:] = False
+        self.is_dealer[next_dealer] = True
         self.dealer_id = next_dealer
 
-    def _set_small_blind(self) -> None:
-        """Set small blind."""
-        next_small_blind = self.__get_next_active_player_id(self.dealer_id + 1)
-        self.players[next_small_blind].is_small_blind = True
+    def _blind_seats(self) -> tuple:
+        """Get the small and big blind seats, heads-up the dealer is small blind."""
+        seats = self._next_after[self.dealer_id]
+        active_seats = seats[self.is_active[seats]]
+
+        if active_seats.size == 1:
+            return int(self.dealer_id), int(active_seats[0])
+        return int(active_seats[0]), int(active_seats[1])
+
+    def _set_blinds(self) -> tuple:
+        """Set small and big blind and return their seats."""
+        small_blind, big_blind = self._blind_seats()
+
+        self.is_small_blind[:] = False
+        self.is_small_blind[small_blind] = True
+        self.is_big_blind[:] = False
+        self.is_big_blind[big_blind] = True
 
-    def _set_big_blind(self) -> None:
-        """Set big blind."""
-        next_big_blind = self.__get_next_active_player_id(self.dealer_id + 1)
-        self.players[next_big_blind].is_big_blind = True
+        return small_blind, big_blind
 
     def _check_action(self, action) -> None:
         """Check if the action is valid."""
@@ -159,106 +208,280 @@ class TexasHoldemEnv(Env):
        
     def step(self, action):
         """Execute action and return next state of the game."""
-        if self.game_state == Phase.PREFLOP:
-            self.__table[Phase.FLOP] = self.deck.draw_random(3)
-            self.game_state = Phase.FLOP
-        elif self.game_state == Phase.FLOP:
-            self.__table[Phase.TURN] = self.deck.draw_random()
-            self.game_state = Phase.TURN
-        elif self.game_state == Phase.TURN:
-            self.__table[Phase.RIVER] = self.deck.draw_random()
-            self.game_state = Phase.SHOWDOWN
-        # self.game_state == Phase.SHOWDOWN:
-        # DO NOTHING
+        self._step_table[self.game_state]()
+
+        return self._obs, 0.0, False, _EMPTY_INFO
+
+    def _step_preflop(self) -> None:
+        """Reveal the flop."""
+        board = 2 * self._n_players
+
+        self._table[Phase.FLOP] = self._deck_perm[board:board + 3]
+        self._board[:3] = self._table[Phase.FLOP]
+        self.game_state = Phase.FLOP
+
+    def _step_flop(self) -> None:
+        """Reveal the turn."""
+        self._table[Phase.TURN] = self._deck_perm[2 * self._n_players + 3]
+        self._board[3] = self._table[Phase.TURN]
+        self.game_state = Phase.TURN
 
-        return self.__table, 0, False, {}
+    def _step_turn(self) -> None:
+        """Reveal the river and go to showdown."""
+        self._table[Phase.RIVER] = self._deck_perm[2 * self._n_players + 4]
+        self._board[4] = self._table[Phase.RIVER]
+        self.game_state = Phase.SHOWDOWN
+
+        # Equity estimation is opt-in, it dominates the cost of a hand
+        if self.equity_iterations > 0:
+            self._compute_equity()
+
+    def _step_noop(self) -> None:
+        """Do nothing, all the cards are already revealed."""
+        pass
+
+    def seed(self, seed: int = None) -> list:
+        """Seed the random generator of the environment and draw a new dealer."""
+        self._rng = np.random.default_rng(seed)
+        self._draw_dealer()
+        return [seed]
+
+    def _compute_equity(self) -> None:
+        """Estimate the equity of each active player.
+
+        Each player plays against as many random hands, drawn from the cards
+        unseen by that player, as there are other active players.
+        """
+        # Imported here to compile the evaluators only when equity is requested
+        from _fast import mc_equity_nb
+
+        board = 2 * self._n_players
+        board_cards = self._deck_perm[board:board + 5]
+        active_players = self._get_active_players()
+
+        self.equity.fill(0)
+        for player_id in active_players:
+            self.equity[player_id] = mc_equity_nb(
+                self.cards[player_id],
+                board_cards,
+                active_players.size - 1,
+                self.equity_iterations,
+                int(self._rng.integers(2**31)),
+            )
 
     # TODO: fix the output of this function
     def reset(self):
         """Reset game."""
-        self.__table = {Phase.FLOP: None, Phase.TURN: None, Phase.RIVER: None}
+        self._table = {Phase.FLOP: None, Phase.TURN: None, Phase.RIVER: None}
+        self._board.fill(-1)
         self.game_state = Phase.PREFLOP
 
-        self.players_active = [
-            idx for idx, player in enumerate(self.players) if player.is_active
-        ]
-
         # Player reset
-        for player_id, player in enumerate(self.players):
-            self.players[player_id].cards = []
+        self.cards.fill(-1)
+        self.equity.fill(0)
+        self.is_active.fill(True)
+        self.is_all_in.fill(False)
 
         # New dealer
-        self.dealer_id = (self.dealer_id + 1) % len(self.players)
+        self._set_dealer()
 
-        self._deal_new_cards()
-
-        self.deck.reset()
-
-        # Set the stake
-        self.stake = 0
+        # Shuffle the deck once per game: hole cards first, then the board
+        self._deck_perm[:] = _DECK
+        self._rng.shuffle(self._deck_perm)
 
-        if self.players[self.dealer_id + 1].stack < self.small_blind:
-            self.stake += self.players[self.dealer_id + 1].stack
-
-            self.players[self.dealer_id + 1].is_all_in = True
-            self.players[self.dealer_id + 1].stack = 0
-        else:
-            self.stake += self.small_blind
+        self._deal_new_cards()
+        self._obs[:2] = self.cards[0]
 
-        if self.players[self.dealer_id + 2].stack < self.big_blind:
-            self.stake += self.players[self.dealer_id + 2].stack
+        # Set the stake, the blinds go all in if short of chips
+        blinds_id = np.array(self._set_blinds())
+        blinds = np.array([self.small_blind, self.big_blind])
 
-            self.players[self.dealer_id + 2].is_all_in = True
-            self.players[self.dealer_id + 2].stack = 0
-        else:
-            self.stake += self.big_blind
+        paid = np.minimum(self.stacks[blinds_id], blinds)
+        self.stake = float(paid.sum())
 
-        # Set the active players
-        for player in self.players:
-            player.is_active = True
+        self.stacks[blinds_id] -= paid
+        self.is_all_in[blinds_id] = self.stacks[blinds_id] == 0
 
-        return self.__table
+        return self._obs
 
     def _deal_new_cards(self):
-        """Deal new cards and set blinds."""
-        self._set_small_blind()
-        self._set_big_blind()
+        """Deal new cards."""
+        number_of_players = self._n_players
+        self.cards[:] = self._deck_perm[:2 * number_of_players].reshape(number_of_players, 2)
 
-        for player in self.players:
-            player.cards = self.deck.draw_random(2)
+    def __setstate__(self, state):
+        """Restore the pickled state, with the board as a view on the observation."""
+        self.__dict__.update(state)
+        self._board = self._obs[2:]
 
     def __str__(self) -> str:
-        """Print current state of the game as text."""
-        if self.__table[Phase.FLOP]:
-            print(
-                f'{self.__table[Phase.FLOP][0]} '
-                f'{self.__table[Phase.FLOP][1]} '
-                f'{self.__table[Phase.FLOP][2]}',
-                end='',
-            )
+        """Get current state of the game as text."""
+        table = self._table
+        parts = []
+
+        if table[Phase.FLOP] is not None:
+            parts.append(' '.join(covert_to_human_readable(card) for card in table[Phase.FLOP]))
         else:
-            print('_ _ _', end='')
+            parts.append('_ _ _')
 
-        if self.__table[Phase.TURN]:
-            print(f' {covert_to_human_readable(self.__table[Phase.TURN])}', end='')
+        if table[Phase.TURN] is not None:
+            parts.append(covert_to_human_readable(table[Phase.TURN]))
         else:
-            print(' _', end='')
+            parts.append('_')
 
-        if self.__table[Phase.RIVER]:
-            print(f' {covert_to_human_readable(self.__table[Phase.RIVER])}')
+        if table[Phase.RIVER] is not None:
+            parts.append(covert_to_human_readable(table[Phase.RIVER]))
         else:
-            print(' _')
+            parts.append('_')
 
-        return ''
+        return ' '.join(parts)
 
         # TODO: used for testing
 
     def random_state(self):
         """Generate random state of the game."""
-        self.__table[Phase.FLOP] = self.deck.draw_random(3)
-        self.__table[Phase.TURN] = self.deck.draw_random()
-        self.__table[Phase.RIVER] = self.deck.draw_random()
+        board = 2 * self._n_players
+
+        self._table[Phase.FLOP] = self._deck_perm[board:board + 3]
+        self._table[Phase.TURN] = self._deck_perm[board + 3]
+        self._table[Phase.RIVER] = self._deck_perm[board + 4]
+        self._board[:] = self._deck_perm[board:board + 5]
 
     def render(self, mode='human', close=False):
         """Render the graphics of the game."""
         pass
+
+
+class BatchTexasHoldemEnv(Env):
+    """Describe a batch of Texas Holdem environments stepped together.
+
+    Every state variable has the environments on the first axis, so that all
+    the games are stepped by the same NumPy operations.
+    """
+
+    def __init__(
+        self,
+        n_envs: int = 64,
+        number_of_players: int = 5,
+        initial_stack: float = 1000,
+        small_blind: float = 10,
+        max_steps: int = 1000,
+        seed: int = None,
+    ):
+        """Init the setup of the class."""
+        self.n_envs = n_envs
+        self.number_of_players = number_of_players
+        self.initial_stack = initial_stack
+
+        # Players state, one entry per environment and player
+        shape = (n_envs, number_of_players)
+        self.stacks = np.full(shape, initial_stack, dtype=np.float64)
+        self.cards = np.full(shape + (2,), -1, dtype=np.int8)
+        self.is_active = np.ones(shape, dtype=bool)
+        self.is_all_in = np.zeros(shape, dtype=bool)
+        self.is_dealer = np.zeros(shape, dtype=bool)
+        self.is_small_blind = np.zeros(shape, dtype=bool)
+        self.is_big_blind = np.zeros(shape, dtype=bool)
+        self.small_blind = small_blind
+        self.big_blind = small_blind * 2.0
+
+        self.action_space = spaces.Discrete(3)
+        self.observation_space = spaces.Box(low=-1, high=51, shape=(7,), dtype=np.int8)
+
+        # Games state, one entry per environment
+        # Observation: hole cards of player 0 followed by the board
+        self._obs = np.full((n_envs, 7), -1, dtype=np.int8)
+        self.board = self._obs[:, 2:]
+        self.phase = np.full(n_envs, Phase.PREFLOP.value, dtype=np.int8)
+        self.stake = np.zeros(n_envs, dtype=np.float64)
+
+        self.max_steps = max_steps
+
+        self._rng = np.random.default_rng(seed)
+        self._deck_perm = np.tile(np.arange(52, dtype=np.int8), (n_envs, 1))
+
+        # Set the dealers
+        self.dealer_id = self._rng.integers(number_of_players, size=n_envs)
+
+        self.reset()
+
+    def step(self, actions: np.ndarray):
+        """Execute the actions and return the next state of all the games."""
+        board = 2 * self.number_of_players
+
+        flop_mask = self.phase == Phase.PREFLOP.value
+        turn_mask = self.phase == Phase.FLOP.value
+        river_mask = self.phase == Phase.TURN.value
+
+        self.board[flop_mask, :3] = self._deck_perm[flop_mask, board:board + 3]
+        self.board[turn_mask, 3] = self._deck_perm[turn_mask, board + 3]
+        self.board[river_mask, 4] = self._deck_perm[river_mask, board + 4]
+
+        self.phase[flop_mask] = Phase.FLOP.value
+        self.phase[turn_mask] = Phase.TURN.value
+        self.phase[river_mask] = Phase.SHOWDOWN.value
+        # self.phase == Phase.SHOWDOWN:
+        # DO NOTHING
+
+        done = self.phase == Phase.SHOWDOWN.value
+
+        return self._obs, np.zeros(self.n_envs), done, _EMPTY_INFO
+
+    def seed(self, seed: int = None) -> list:
+        """Seed the random generator of the environments and draw new dealers."""
+        self._rng = np.random.default_rng(seed)
+        self.dealer_id = self._rng.integers(self.number_of_players, size=self.n_envs)
+        return [seed]
+
+    def reset(self, done_mask: np.ndarray = None):
+        """Reset the games in done_mask, or all of them if not given."""
+        if done_mask is None:
+            done_mask = np.ones(self.n_envs, dtype=bool)
+
+        envs = np.flatnonzero(done_mask)
+        number_of_players = self.number_of_players
+
+        self.board[envs] = -1
+        self.phase[envs] = Phase.PREFLOP.value
+
+        # New dealer and blinds
+        self.dealer_id[envs] = (self.dealer_id[envs] + 1) % number_of_players
+
+        seats = np.arange(number_of_players)
+        dealer_id = self.dealer_id[envs, None]
+        # Heads-up the dealer is small blind
+        blinds_offset = np.array([0, 1]) if number_of_players == 2 else np.array([1, 2])
+        blinds_id = (dealer_id + blinds_offset) % number_of_players
+
+        self.is_dealer[envs] = seats == dealer_id
+        self.is_small_blind[envs] = seats == blinds_id[:, :1]
+        self.is_big_blind[envs] = seats == blinds_id[:, 1:]
+
+        # Shuffle the decks: hole cards first, then the board
+        self._deck_perm[envs] = _DECK
+        self._deck_perm[envs] = self._rng.permuted(self._deck_perm[envs], axis=1)
+        self.cards[envs] = self._deck_perm[envs, :2 * number_of_players].reshape(envs.size, number_of_players, 2)
+        self._obs[envs, :2] = self.cards[envs, 0]
+
+        # Set the stake, the blinds go all in if short of chips
+        blinds = np.array([self.small_blind, self.big_blind])
+        paid = np.minimum(np.take_along_axis(self.stacks[envs], blinds_id, axis=1), blinds)
+        self.stake[envs] = paid.sum(axis=1)
+
+        self.stacks[envs[:, None], blinds_id] -= paid
+        self.is_all_in[envs] = False
+        self.is_all_in[envs[:, None], blinds_id] = self.stacks[envs[:, None], blinds_id] == 0
+
+        # Set the active players
+        self.is_active[envs] = True
+
+        return self._obs
+
+    def __setstate__(self, state):
+        """Restore the pickled state, with the board as a view on the observation."""
+        self.__dict__.update(state)
+        self.board = self._obs[:, 2:]
+
+    def render(self, mode='human', close=False):
+        """Render the graphics of the games."""
+        pass